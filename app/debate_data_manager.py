@@ -1,5 +1,6 @@
 import json
 import os
+import threading
 from typing import List, Dict, Any
 from pydantic import BaseModel
 
@@ -22,6 +23,8 @@ class DebateDataManager:
     def __init__(self, file_path: str = "../debate_data.json"):
         self.file_path = file_path
         self.data = self._load_data()
+        # Research may be prefetched from background threads, so writes are serialized
+        self._lock = threading.RLock()
 
     def _load_data(self) -> DebateData:
         if os.path.exists(self.file_path):
@@ -31,37 +34,47 @@ class DebateDataManager:
         return DebateData()
 
     def _save_data(self):
-        with open(self.file_path, 'w') as f:
-            json.dump(self.data.dict(), f, indent=2)
+        with self._lock:
+            with open(self.file_path, 'w') as f:
+                json.dump(self.data.dict(), f, indent=2)
 
     def add_round(self, round_num: int, position: str, topic: str, sources: List[Dict[str, str]], bullet_points: List[str]):
-        new_round = DebateRound(
-            round=round_num,
-            position=position,
-            topic=topic,
-            sources=[Source(**source) for source in sources],
-            bullet_points=bullet_points
-        )
-        self.data.rounds.append(new_round)
-        self._save_data()
+        with self._lock:
+            for round_data in self.data.rounds:
+                if round_data.round == round_num and round_data.position == position and round_data.topic == topic:
+                    # Replace earlier research for this round, keeping any argument already written
+                    round_data.sources = [Source(**source) for source in sources]
+                    round_data.bullet_points = bullet_points
+                    self._save_data()
+                    return
+            new_round = DebateRound(
+                round=round_num,
+                position=position,
+                topic=topic,
+                sources=[Source(**source) for source in sources],
+                bullet_points=bullet_points
+            )
+            self.data.rounds.append(new_round)
+            self._save_data()
 
     def add_argument(self, round_num: int, position: str, topic: str, argument: str):
-        for round_data in self.data.rounds:
-            if round_data.round == round_num and round_data.position == position and round_data.topic == topic:
-                round_data.argument = argument
-                self._save_data()
-                return
-        # If the round doesn't exist, create a new one with the argument
-        new_round = DebateRound(
-            round=round_num,
-            position=position,
-            topic=topic,
-            sources=[],
-            bullet_points=[],
-            argument=argument
-        )
-        self.data.rounds.append(new_round)
-        self._save_data()
+        with self._lock:
+            for round_data in self.data.rounds:
+                if round_data.round == round_num and round_data.position == position and round_data.topic == topic:
+                    round_data.argument = argument
+                    self._save_data()
+                    return
+            # If the round doesn't exist, create a new one with the argument
+            new_round = DebateRound(
+                round=round_num,
+                position=position,
+                topic=topic,
+                sources=[],
+                bullet_points=[],
+                argument=argument
+            )
+            self.data.rounds.append(new_round)
+            self._save_data()
 
     def get_round(self, round_num: int, position: str) -> Dict[str, Any]:
         for round_data in self.data.rounds:
@@ -88,6 +101,14 @@ class DebateDataManager:
                 return round_data.argument
         return ""
 
+    def get_research(self, round_num: int, position: str, topic: str) -> str:
+        """Return a round's research bullet points in the same format research() returns them."""
+        with self._lock:
+            for round_data in self.data.rounds:
+                if round_data.round == round_num and round_data.position == position and round_data.topic == topic:
+                    return "\n".join([f"• {point}" for point in round_data.bullet_points])
+        return ""
+
     def get_all_rounds(self) -> List[Dict[str, Any]]:
         return [round_data.dict() for round_data in self.data.rounds]
 
@@ -1,9 +1,9 @@
-import os
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
-from llama_index.program.openai import OpenAIPydanticProgram
-from llama_index.llms.openai import OpenAI
+from app.model_router import get_router
 from app.research import research
+from app.debate_data_manager import DebateDataManager
+from app.resilience import deadline
 import logging
 
 # Set up logging
@@ -22,7 +22,7 @@ class ArgumentJudgement(BaseModel):
     explanation: str = Field(description="Explanation of the judgement")
 
 
-def generate_oral_argument(topic: str, position: str, round_num: int, total_rounds: int, opponent_argument: str = None):
+def generate_oral_argument(topic: str, position: str, round_num: int, total_rounds: int, opponent_argument: str = None, bullet_points: str = None, manager: DebateDataManager = None):
     # Determine the type of round
     if round_num == 1:
         round_type = "opening"
@@ -31,16 +31,13 @@ def generate_oral_argument(topic: str, position: str, round_num: int, total_roun
     else:
         round_type = "rebuttal"
 
-    # Step 1: Conduct research (only for opening and rebuttal rounds)
-    bullet_points = research(topic, position, round_num) if round_type != "conclusion" else ""
+    # Step 1: Conduct research (only for opening and rebuttal rounds) unless it was
+    # prefetched, leaving part of the turn's deadline for writing the argument itself
+    if bullet_points is None:
+        with deadline(fraction=0.7):
+            bullet_points = research(topic, position, round_num, manager=manager) if round_type != "conclusion" else ""
     
     # Step 2: Generate an oral argument
-    api_key = os.getenv('OPENAI_API_KEY')
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
-    
-    llm = OpenAI(api_key=api_key, temperature=0.7, model="gpt-4o")
-
     argument_prompt = f"""
     You are participating in an oral debate. Your position is STRONGLY {position} the topic: "{topic}".
     This is the {round_type} round. Your task is to create a persuasive 30-45 second speech that will be 
@@ -69,27 +66,15 @@ def generate_oral_argument(topic: str, position: str, round_num: int, total_roun
     Don't use "ladies and gentlemen" or "thank you" at the end of your argument.
     """
 
-    argument_program = OpenAIPydanticProgram.from_defaults(
-        output_cls=OralArgument,
-        llm=llm,
-        prompt_template_str=argument_prompt,
-        verbose=True,
-    )
-
     try:
-        generated_argument = argument_program()
+        generated_argument = get_router().run_program("argument", OralArgument, argument_prompt, temperature=0.7)
         return generated_argument.speech.strip()
     except Exception as e:
+        # Return None rather than placeholder text so callers never send an error message to TTS
         logger.error(f"Error generating oral argument: {str(e)}")
-        return "Failed to generate oral argument due to an error."
+        return None
 
 def revise_argument(original_argument: str, transcript: str, position: str, topic: str):
-    api_key = os.getenv('OPENAI_API_KEY')
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
-    
-    llm = OpenAI(api_key=api_key, temperature=0.7, model="gpt-4-turbo-preview")
-
     revision_prompt = f"""
     You are participating in an oral debate. Your position is STRONGLY {position} the topic: "{topic}".
     You have just made the following argument:
@@ -109,27 +94,14 @@ def revise_argument(original_argument: str, transcript: str, position: str, topi
     If no revision is necessary, return the original argument. Otherwise, provide a revised version.
     """
 
-    revision_program = OpenAIPydanticProgram.from_defaults(
-        output_cls=OralArgument,
-        llm=llm,
-        prompt_template_str=revision_prompt,
-        verbose=True,
-    )
-
     try:
-        revised_argument = revision_program()
+        revised_argument = get_router().run_program("revise", OralArgument, revision_prompt, temperature=0.7)
         return revised_argument.speech.strip()
     except Exception as e:
         logger.error(f"Error revising oral argument: {str(e)}")
         return original_argument
     
 def judge_argument(argument: str, topic: str):
-    api_key = os.getenv('OPENAI_API_KEY')
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
-    
-    llm = OpenAI(api_key=api_key, temperature=0.2, model="gpt-4-turbo-preview")
-
     judgement_prompt = f"""
     You are an impartial judge in a debate on the topic: "{topic}".
     Your task is to determine whether the following argument is for or against the topic:
@@ -140,27 +112,14 @@ def judge_argument(argument: str, topic: str):
     Provide your judgement along with a brief explanation of your reasoning.
     """
 
-    judgement_program = OpenAIPydanticProgram.from_defaults(
-        output_cls=ArgumentJudgement,
-        llm=llm,
-        prompt_template_str=judgement_prompt,
-        verbose=True,
-    )
-
     try:
-        judgement = judgement_program()
+        judgement = get_router().run_program("judge", ArgumentJudgement, judgement_prompt, temperature=0.2)
         return judgement
     except Exception as e:
         logger.error(f"Error judging argument: {str(e)}")
         return ArgumentJudgement(position="unknown", explanation="Failed to judge the argument due to an error.")
 
 def re_revise_argument(original_argument: str, transcript: str, position: str, topic: str, judgement: ArgumentJudgement, prior_arguments: list, sources: list):
-    api_key = os.getenv('OPENAI_API_KEY')
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
-    
-    llm = OpenAI(api_key=api_key, temperature=0.7, model="gpt-4-turbo-preview")
-
     revision_prompt = f"""
     You are participating in an oral debate. Your position is STRONGLY {position} the topic: "{topic}".
     You have just made the following argument:
@@ -192,15 +151,8 @@ def re_revise_argument(original_argument: str, transcript: str, position: str, t
     Remember, you are passionately {position} the topic "{topic}". Make sure your revised argument clearly reflects this position.
     """
 
-    revision_program = OpenAIPydanticProgram.from_defaults(
-        output_cls=OralArgument,
-        llm=llm,
-        prompt_template_str=revision_prompt,
-        verbose=True,
-    )
-
     try:
-        revised_argument = revision_program()
+        revised_argument = get_router().run_program("re_revise", OralArgument, revision_prompt, temperature=0.7)
         return revised_argument.speech.strip()
     except Exception as e:
         logger.error(f"Error re-revising oral argument: {str(e)}")
@@ -209,6 +161,8 @@ def re_revise_argument(original_argument: str, transcript: str, position: str, t
 def generate_and_validate_argument(topic: str, position: str, round_num: int, total_rounds: int, debate_transcript: str, opponent_argument: str = None, prior_arguments: list = None, sources: list = None):
     # Generate initial argument
     argument = generate_oral_argument(topic, position, round_num, total_rounds, opponent_argument)
+    if argument is None:
+        return None
     
     # Revise argument if not the first round
     if round_num > 1:
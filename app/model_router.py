@@ -0,0 +1,308 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+from dotenv import load_dotenv
+from pydantic import BaseModel, ConfigDict, Field
+from llama_index.program.openai import OpenAIPydanticProgram
+from llama_index.core.program import LLMTextCompletionProgram
+from llama_index.llms.openai import OpenAI
+from app.resilience import RetryPolicy, DeadlineExceeded, call_with_resilience, clamp_timeout, time_remaining
+import logging
+
+load_dotenv('../.env')
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class Endpoint(BaseModel):
+    """An OpenAI-compatible model endpoint that a pipeline stage can be routed to."""
+    # Reject misspelled keys in the routes file instead of silently falling back to defaults
+    model_config = ConfigDict(extra="forbid")
+
+    model: str = Field(description="The model name to request from the endpoint")
+    api_base: Optional[str] = Field(default=None, description="Base URL of an OpenAI-compatible server; None means api.openai.com")
+    api_key_env: str = Field(default="OPENAI_API_KEY", description="Environment variable holding the API key for this endpoint")
+    timeout: float = Field(default=60.0, description="Per-request timeout in seconds")
+    max_retries: int = Field(default=0, description="Retries performed by the client itself; the resilience layer already retries")
+    is_function_calling_model: bool = Field(default=True, description="Whether the model supports tool calls; set False for local models that don't")
+
+    @property
+    def name(self) -> str:
+        return f"{self.model}@{self.api_base or 'openai'}"
+
+# Stage name -> ordered list of endpoints. The first entry is the preferred one;
+# the rest are fallbacks and hedges. These match the models the pipeline used
+# before the router existed.
+DEFAULT_ROUTES: Dict[str, List[Endpoint]] = {
+    "argument": [Endpoint(model="gpt-4o"), Endpoint(model="gpt-4-turbo-preview")],
+    "revise": [Endpoint(model="gpt-4-turbo-preview"), Endpoint(model="gpt-4o")],
+    "judge": [Endpoint(model="gpt-4-turbo-preview"), Endpoint(model="gpt-4o")],
+    "re_revise": [Endpoint(model="gpt-4-turbo-preview"), Endpoint(model="gpt-4o")],
+    "search": [Endpoint(model="gpt-4o-mini"), Endpoint(model="gpt-4o")],
+    "research": [Endpoint(model="gpt-4o-mini"), Endpoint(model="gpt-4o")],
+}
+
+class EndpointStats:
+    """Live error-rate tracking for a single endpoint (exponentially weighted)."""
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self.error_rate = 0.0
+        self.calls = 0
+        self.last_failure: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        with self._lock:
+            self.calls += 1
+            self.error_rate = (1 - self.alpha) * self.error_rate
+
+    def record_failure(self):
+        with self._lock:
+            self.calls += 1
+            self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+            self.last_failure = time.monotonic()
+
+class LatencyStats:
+    """Live latency tracking (exponentially weighted) for one endpoint serving one stage.
+
+    Kept per stage because stages send very different workloads: a short search
+    evaluation says nothing about how long a full argument should take.
+    """
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self.latency: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, latency: float):
+        with self._lock:
+            self.latency = latency if self.latency is None else self.alpha * latency + (1 - self.alpha) * self.latency
+
+class ModelRouter:
+    """Routes each pipeline stage to an ordered list of endpoints.
+
+    Endpoints are tried in configured order, with unhealthy (high error rate) and
+    unusually slow endpoints demoted. If the current attempt has not finished
+    after the hedge delay, the next endpoint is started in parallel and the first
+    successful result wins. Failed attempts fail over to the next endpoint.
+    """
+
+    def __init__(self, routes: Dict[str, List[Endpoint]] = None, hedge_after: float = 20.0,
+                 hedge_factor: float = 2.0, unhealthy_error_rate: float = 0.5, slow_factor: float = 3.0,
+                 recovery_after: float = 60.0, retry_policy: RetryPolicy = None):
+        self.routes = routes or DEFAULT_ROUTES
+        self.hedge_after = hedge_after
+        self.hedge_factor = hedge_factor
+        self.unhealthy_error_rate = unhealthy_error_rate
+        self.slow_factor = slow_factor
+        self.recovery_after = recovery_after
+        # Keep per-endpoint retries short; failing over is usually faster than waiting
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=2, base_delay=0.5, max_delay=5.0)
+        self.stats: Dict[str, EndpointStats] = {}
+        self.latencies: Dict[Tuple[str, str], LatencyStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """Build a router, overriding default routes from the JSON file in LLM_ROUTES_FILE if set.
+
+        The file maps stage names to lists of endpoints, e.g.
+        {"argument": [{"model": "llama3.1", "api_base": "http://localhost:11434/v1", "api_key_env": "LOCAL_API_KEY"},
+                      {"model": "gpt-4o"}]}
+        Stages not present in the file keep their default route.
+        """
+        routes = dict(DEFAULT_ROUTES)
+        routes_file = os.getenv('LLM_ROUTES_FILE')
+        if routes_file:
+            with open(routes_file, 'r') as f:
+                config = json.load(f)
+            for stage, endpoints in config.items():
+                if stage not in DEFAULT_ROUTES:
+                    raise ValueError(f"Unknown stage '{stage}' in {routes_file}; expected one of {', '.join(DEFAULT_ROUTES)}")
+                routes[stage] = [Endpoint(**endpoint) for endpoint in endpoints]
+        hedge_after = float(os.getenv('LLM_HEDGE_AFTER', 20.0))
+        return cls(routes=routes, hedge_after=hedge_after)
+
+    def _stats_for(self, endpoint: Endpoint) -> EndpointStats:
+        with self._lock:
+            if endpoint.name not in self.stats:
+                self.stats[endpoint.name] = EndpointStats()
+            return self.stats[endpoint.name]
+
+    def _latency_for(self, stage: str, endpoint: Endpoint) -> LatencyStats:
+        key = (stage, endpoint.name)
+        with self._lock:
+            if key not in self.latencies:
+                self.latencies[key] = LatencyStats()
+            return self.latencies[key]
+
+    def ordered_endpoints(self, stage: str) -> List[Endpoint]:
+        if stage not in self.routes:
+            raise ValueError(f"No route configured for stage '{stage}'")
+        endpoints = self.routes[stage]
+        if not endpoints:
+            raise ValueError(f"Route for stage '{stage}' has no endpoints")
+        latencies = [self._latency_for(stage, e).latency for e in endpoints if self._latency_for(stage, e).latency is not None]
+        fastest = min(latencies) if latencies else None
+
+        def sort_key(item):
+            index, endpoint = item
+            stats = self._stats_for(endpoint)
+            # A demoted endpoint gets its priority back once it has been quiet for a while
+            recently_failed = stats.last_failure is not None and time.monotonic() - stats.last_failure < self.recovery_after
+            unhealthy = recently_failed and stats.error_rate >= self.unhealthy_error_rate
+            latency = self._latency_for(stage, endpoint).latency
+            slow = fastest is not None and latency is not None and latency > self.slow_factor * fastest
+            return (unhealthy, slow, index)
+
+        return [endpoint for _, endpoint in sorted(enumerate(endpoints), key=sort_key)]
+
+    def _hedge_delay(self, stage: str, endpoint: Endpoint) -> float:
+        latency = self._latency_for(stage, endpoint).latency
+        if latency is None:
+            return self.hedge_after
+        return min(self.hedge_after, max(1.0, latency * self.hedge_factor))
+
+    def build_llm(self, endpoint: Endpoint, temperature: float):
+        api_key = os.getenv(endpoint.api_key_env)
+        if not api_key:
+            if endpoint.api_base is None:
+                raise ValueError(f"{endpoint.api_key_env} not found in environment variables")
+            # Local OpenAI-compatible servers usually ignore the key, but the client requires one
+            api_key = "not-needed"
+
+        if endpoint.api_base is None:
+            return OpenAI(api_key=api_key, temperature=temperature, model=endpoint.model,
+                          timeout=clamp_timeout(endpoint.timeout), max_retries=endpoint.max_retries)
+
+        # OpenAI() validates model names against OpenAI's catalogue, so arbitrary
+        # models served by other OpenAI-compatible servers go through OpenAILike.
+        from llama_index.llms.openai_like import OpenAILike
+        return OpenAILike(api_key=api_key, api_base=endpoint.api_base, temperature=temperature,
+                          model=endpoint.model, timeout=clamp_timeout(endpoint.timeout), max_retries=endpoint.max_retries,
+                          is_chat_model=True, is_function_calling_model=endpoint.is_function_calling_model)
+
+    def _attempt(self, stage: str, endpoint: Endpoint, call: Callable, temperature: float):
+        stats = self._stats_for(endpoint)
+        start = time.monotonic()
+        try:
+            result = call_with_resilience(
+                f"llm:{endpoint.name}",
+                lambda: call(self.build_llm(endpoint, temperature)),
+                policy=self.retry_policy,
+            )
+        except DeadlineExceeded:
+            # Running out of time is the caller's budget, not the endpoint's fault
+            raise
+        except Exception:
+            stats.record_failure()
+            raise
+        stats.record_success()
+        self._latency_for(stage, endpoint).record(time.monotonic() - start)
+        return result
+
+    def _submit(self, executor: ThreadPoolExecutor, stage: str, endpoint: Endpoint, call: Callable, temperature: float):
+        # Run each attempt in a copy of the caller's context so its deadline applies in the worker thread
+        context = contextvars.copy_context()
+        return executor.submit(context.run, self._attempt, stage, endpoint, call, temperature)
+
+    def run(self, stage: str, call: Callable[..., T], temperature: float = 0.7) -> T:
+        """Run call(llm) against the endpoints for a stage, hedging slow attempts and failing over on errors.
+
+        Each attempt goes through the resilience layer (retries and a per-endpoint
+        circuit breaker). Raises the last error if every endpoint fails, or
+        DeadlineExceeded if the current deadline runs out first.
+        """
+        endpoints = self.ordered_endpoints(stage)
+        pending = {}
+        last_error = None
+        next_index = 0
+
+        executor = ThreadPoolExecutor(max_workers=len(endpoints))
+        try:
+            while True:
+                if next_index < len(endpoints) and (not pending or last_error is not None):
+                    # Nothing running, or the last attempt failed: fail over right away
+                    last_error = None
+                    endpoint = endpoints[next_index]
+                    next_index += 1
+                    pending[self._submit(executor, stage, endpoint, call, temperature)] = endpoint
+                if not pending:
+                    break
+
+                timeout = self._hedge_delay(stage, endpoints[next_index - 1]) if next_index < len(endpoints) else None
+                remaining = time_remaining()
+                if remaining is not None:
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done and time_remaining() == 0:
+                    raise DeadlineExceeded(f"Deadline exceeded waiting on stage '{stage}'")
+                if not done and next_index >= len(endpoints):
+                    continue
+                if not done:
+                    # The newest attempt is slow: hedge with the next endpoint in parallel
+                    endpoint = endpoints[next_index]
+                    next_index += 1
+                    logger.info(f"Stage '{stage}': hedging with {endpoint.name}")
+                    pending[self._submit(executor, stage, endpoint, call, temperature)] = endpoint
+                    continue
+
+                for future in done:
+                    endpoint = pending.pop(future)
+                    try:
+                        return future.result()
+                    except Exception as e:
+                        logger.warning(f"Stage '{stage}': {endpoint.name} failed: {str(e)}")
+                        last_error = e
+                if next_index >= len(endpoints) and not pending:
+                    break
+        finally:
+            # Don't wait on losing hedges; their results are simply discarded
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        raise last_error
+
+    def run_program(self, stage: str, output_cls, prompt_template_str: str, temperature: float = 0.7):
+        """Run a structured-output program for a stage through the router.
+
+        Endpoints that support tool calls use OpenAIPydanticProgram; the rest parse
+        the model's text completion into output_cls instead.
+        """
+        def call(llm):
+            if llm.metadata.is_function_calling_model:
+                program = OpenAIPydanticProgram.from_defaults(
+                    output_cls=output_cls,
+                    llm=llm,
+                    prompt_template_str=prompt_template_str,
+                    verbose=True,
+                )
+            else:
+                program = LLMTextCompletionProgram.from_defaults(
+                    output_cls=output_cls,
+                    llm=llm,
+                    prompt_template_str=prompt_template_str,
+                    verbose=True,
+                )
+            return program()
+
+        return self.run(stage, call, temperature=temperature)
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+def get_router() -> ModelRouter:
+    """Return the process-wide router so endpoint health is shared across stages."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter.from_env()
+        return _router
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Optional, Tuple
+from app.research import research
+from app.debate_data_manager import DebateDataManager
+from app.resilience import deadline, time_remaining
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ResearchPrefetcher:
+    """Researches upcoming rounds in the background while the current round is written and spoken.
+
+    Research queries don't depend on earlier rounds' text, so any upcoming opening
+    or rebuttal round can be researched early. Results are stored in the shared
+    DebateDataManager and read back when the turn starts.
+    """
+
+    def __init__(self, manager: DebateDataManager, topic: str, total_rounds: int, turn_deadline: float, max_workers: int = 2):
+        self.manager = manager
+        self.topic = topic
+        self.total_rounds = total_rounds
+        self.turn_deadline = turn_deadline
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.prefetched: Dict[Tuple[int, str], object] = {}
+
+    def prefetch(self, round_num: int):
+        # Conclusions don't use research
+        if round_num >= self.total_rounds:
+            return
+        for position in ("for", "against"):
+            if (round_num, position) not in self.prefetched:
+                self.prefetched[(round_num, position)] = self.executor.submit(self._research, position, round_num)
+
+    def _research(self, position: str, round_num: int):
+        with deadline(self.turn_deadline):
+            research(self.topic, position, round_num, manager=self.manager)
+
+    def get(self, position: str, round_num: int) -> Optional[str]:
+        """Wait for a round's prefetched research and return its bullet points.
+
+        Call this inside the turn's deadline: the wait gets the same share of it as
+        inline research would. Returns None if nothing was prefetched or the prefetch
+        failed, so the caller researches inline, and empty bullet points if the wait
+        ran out of time, so the argument is written without research.
+        """
+        future = self.prefetched.pop((round_num, position), None)
+        if future is None:
+            return None
+        with deadline(fraction=0.7):
+            try:
+                future.result(timeout=time_remaining())
+            except FutureTimeoutError:
+                logger.error(f"Prefetched research for {position} in round {round_num} timed out; continuing without research")
+                return ""
+            except Exception as e:
+                logger.error(f"Prefetched research for {position} in round {round_num} failed: {str(e)}")
+                return None
+        return self.manager.get_research(round_num, position, self.topic)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
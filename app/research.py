@@ -1,10 +1,9 @@
 from app.web_search import web_search
-from llama_index.program.openai import OpenAIPydanticProgram
-from llama_index.llms.openai import OpenAI
+from app.model_router import get_router
+from app.resilience import DeadlineExceeded, check_deadline
 from pydantic import BaseModel, Field
 from typing import List
 from dotenv import load_dotenv
-import os
 import logging
 from app.debate_data_manager import DebateDataManager
 
@@ -23,19 +22,18 @@ class ResearchSummary(BaseModel):
     """Represents a summary of research results."""
     bullet_points: List[BulletPoint] = Field(description="A list of bullet points summarizing the research")
 
-def research(topic: str, position: str, round_num: int, additional_context: str = None):
+def research(topic: str, position: str, round_num: int, additional_context: str = None, manager: DebateDataManager = None):
     search_results = web_search(topic, position, additional_context)
 
-    # LLM setup
-    api_key = os.getenv('OPENAI_API_KEY')
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
-    
-    llm = OpenAI(api_key=api_key, temperature=0.7, model="gpt-4o-mini")
-
     all_bullet_points = []
 
     for result in search_results:
+        try:
+            check_deadline()
+        except DeadlineExceeded:
+            logger.warning("Deadline reached, summarizing the research condensed so far")
+            break
+
         condense_prompt = f"""
         You are a graduate student whose advisor is about to debate {topic}.
 
@@ -54,15 +52,8 @@ def research(topic: str, position: str, round_num: int, additional_context: str
         Each bullet point should be a concise summary of a key piece of information.
         """
 
-        research_program = OpenAIPydanticProgram.from_defaults(
-            output_cls=ResearchSummary,
-            llm=llm,
-            prompt_template_str=condense_prompt,
-            verbose=True,
-        )
-
         try:
-            research_summary = research_program()
+            research_summary = get_router().run_program("research", ResearchSummary, condense_prompt, temperature=0.7)
             all_bullet_points.extend(research_summary.bullet_points)
         except Exception as e:
             logger.error(f"Error condensing research result: {str(e)}")
@@ -88,15 +79,8 @@ def research(topic: str, position: str, round_num: int, additional_context: str
         {additional_context or ''}
         """
 
-        final_summary_program = OpenAIPydanticProgram.from_defaults(
-            output_cls=ResearchSummary,
-            llm=llm,
-            prompt_template_str=summarize_prompt,
-            verbose=True,
-        )
-
         try:
-            final_summary = final_summary_program()
+            final_summary = get_router().run_program("research", ResearchSummary, summarize_prompt, temperature=0.7)
             unique_points = [point.point for point in final_summary.bullet_points]
         except Exception as e:
             logger.error(f"Error creating final summary: {str(e)}")
@@ -105,7 +89,7 @@ def research(topic: str, position: str, round_num: int, additional_context: str
     results = "\n".join([f"• {point}" for point in unique_points])
     
     # After conducting research and generating bullet points
-    manager = DebateDataManager()
+    manager = manager or DebateDataManager()
     manager.add_round(
         round_num=round_num,
         position=position,
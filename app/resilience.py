@@ -0,0 +1,200 @@
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, TypeVar
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class DeadlineExceeded(Exception):
+    """Raised when the current deadline has passed, or would pass before a retry could run."""
+
+class CircuitOpenError(Exception):
+    """Raised when a service's circuit breaker is open and calls are being short-circuited."""
+
+# Absolute time.monotonic() deadline for the current call chain, or None for no deadline
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+@contextmanager
+def deadline(seconds: Optional[float] = None, fraction: Optional[float] = None):
+    """Set a deadline for everything called inside the block.
+
+    Either an absolute budget in seconds, or a fraction of whatever remains of the
+    enclosing deadline. Nested deadlines can only tighten the enclosing one.
+    """
+    now = time.monotonic()
+    outer = _deadline.get()
+    new = outer
+    if seconds is not None:
+        new = now + seconds if outer is None else min(outer, now + seconds)
+    elif fraction is not None and outer is not None:
+        new = now + max(0.0, outer - now) * fraction
+    token = _deadline.set(new)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def time_remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None if there is no deadline."""
+    current = _deadline.get()
+    if current is None:
+        return None
+    return max(0.0, current - time.monotonic())
+
+def check_deadline():
+    remaining = time_remaining()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded("Deadline exceeded")
+
+def clamp_timeout(timeout: float) -> float:
+    """Shrink a per-request timeout so it does not outlive the current deadline."""
+    remaining = time_remaining()
+    if remaining is None:
+        return timeout
+    return max(0.1, min(timeout, remaining))
+
+class CircuitBreaker:
+    """Per-service circuit breaker.
+
+    After failure_threshold consecutive failures the circuit opens and calls fail
+    fast. Once reset_timeout has passed a single trial call is let through
+    (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+            # Open, or half-open with the trial call still in flight
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"Circuit breaker for '{self.name}' opened after {self.failures} failures")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(service: str) -> CircuitBreaker:
+    """Return the shared circuit breaker for a service, creating it on first use."""
+    with _breakers_lock:
+        if service not in _breakers:
+            _breakers[service] = CircuitBreaker(service)
+        return _breakers[service]
+
+class RetryPolicy:
+    """Jittered exponential backoff settings."""
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        # "Full jitter": uniform between 0 and the capped exponential delay
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Extract a Retry-After delay from an HTTP error's response headers, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def is_retryable(error: Exception) -> bool:
+    """Transient errors are retried; configuration and client errors are not."""
+    if isinstance(error, (ValueError, DeadlineExceeded, CircuitOpenError)):
+        return False
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status_code, int) and 400 <= status_code < 500:
+        return status_code in (408, 409, 429)
+    return True
+
+def call_with_resilience(service: str, call: Callable[[], T], policy: RetryPolicy = None) -> T:
+    """Call a service with retries, Retry-After handling, circuit breaking and deadline checks.
+
+    Raises CircuitOpenError if the service's breaker is open, DeadlineExceeded if
+    the deadline runs out, or the last error once retries are exhausted.
+    """
+    policy = policy or RetryPolicy()
+    breaker = get_breaker(service)
+
+    for attempt in range(policy.max_attempts):
+        check_deadline()
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit breaker for '{service}' is open")
+        try:
+            result = call()
+        except Exception as e:
+            if not is_retryable(e):
+                # The service answered; the request itself was bad, so don't trip the breaker
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            if attempt == policy.max_attempts - 1 or breaker.state == "open":
+                # Out of attempts, or the failure (re)opened the breaker: surface the real error
+                raise
+            delay = retry_after_seconds(e)
+            if delay is None:
+                delay = policy.backoff(attempt)
+            elif delay > policy.max_delay:
+                # The server wants us gone for longer than we're willing to wait; retrying
+                # early would just be refused again, so let the caller fail over instead
+                raise
+            remaining = time_remaining()
+            if remaining is not None and delay >= remaining:
+                raise DeadlineExceeded(f"Deadline would pass before retrying '{service}'") from e
+            logger.warning(f"{service} failed ({str(e)}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
@@ -3,9 +3,8 @@ from playwright.sync_api import sync_playwright
 from pydantic import BaseModel, Field
 from typing import List
 from dotenv import load_dotenv
-import os
-from llama_index.program.openai import OpenAIPydanticProgram
-from llama_index.llms.openai import OpenAI
+from app.model_router import get_router
+from app.resilience import DeadlineExceeded, call_with_resilience, check_deadline, clamp_timeout
 import logging
 
 load_dotenv('../.env')
@@ -31,13 +30,6 @@ class SearchQuery(BaseModel):
 def web_search(topic: str, for_against: str, additional_context: str = None):
     sources = []
 
-    # LLM setup
-    api_key = os.getenv('OPENAI_API_KEY')
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
-    
-    llm = OpenAI(api_key=api_key, temperature=0.7, model="gpt-4o-mini")
-
     # Search query generation
     search_query_prompt = f"""
     You are a graduate student whose advisor is about to debate {topic}.
@@ -47,40 +39,39 @@ def web_search(topic: str, for_against: str, additional_context: str = None):
     {additional_context or ''}
     """
 
-    search_query_program = OpenAIPydanticProgram.from_defaults(
-        output_cls=SearchQuery,
-        llm=llm,
-        prompt_template_str=search_query_prompt,
-        verbose=True,
-    )
-
     try:
-        search_query_result = search_query_program()
+        search_query_result = get_router().run_program("search", SearchQuery, search_query_prompt, temperature=0.7)
         search_query = search_query_result.query
         logger.info(f"Generated search query: {search_query}")
     except Exception as e:
         logger.error(f"Error generating search query: {str(e)}")
         return sources
 
-    # Perform search
+    # Perform search (DuckDuckGo rate-limits aggressively, so retry with backoff)
     try:
-        results = DDGS().text(
+        results = call_with_resilience("duckduckgo", lambda: DDGS().text(
             search_query,
             safesearch='off',
             timelimit='y',
             max_results=10
-        )
+        ))
     except Exception as e:
-        logger.error(f"Error performing DuckDuckGo search: {str(e)}")
+        logger.error(f"Error performing DuckDuckGo search, continuing without web sources: {str(e)}")
         return sources
 
     # Process search results
     for result in results:
+        try:
+            check_deadline()
+        except DeadlineExceeded:
+            logger.warning(f"Deadline reached, keeping the {len(sources)} sources found so far")
+            break
+
         try:
             with sync_playwright() as p:
                 browser = p.chromium.launch(headless=True)
                 page = browser.new_page()
-                page.set_default_timeout(60000)
+                page.set_default_timeout(clamp_timeout(60.0) * 1000)
                 page.goto(result['href'])
                 text = page.text_content("body")
                 browser.close()
@@ -108,15 +99,8 @@ def web_search(topic: str, for_against: str, additional_context: str = None):
 
         logger.info(f"Evaluating search result: {result['href']}")
 
-        eval_program = OpenAIPydanticProgram.from_defaults(
-            output_cls=SearchResultEval,
-            llm=llm,
-            prompt_template_str=eval_prompt,
-            verbose=True,
-        )
-
         try:
-            eval_result = eval_program()
+            eval_result = get_router().run_program("search", SearchResultEval, eval_prompt, temperature=0.7)
 
             if eval_result.evaluation == 1:
                 sources.append(SearchResult(
@@ -7,6 +7,8 @@ from app.make_argument import (
 
 )
 from app.debate_data_manager import DebateDataManager
+from app.prefetch import ResearchPrefetcher
+from app.resilience import call_with_resilience, clamp_timeout, deadline
 from dotenv import load_dotenv
 import os
 
@@ -18,6 +20,10 @@ if not api_key:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Time budgets (seconds) for writing one side's argument and for rendering one speech
+TURN_DEADLINE = float(os.getenv('DEBATE_TURN_DEADLINE', 600))
+TTS_DEADLINE = float(os.getenv('DEBATE_TTS_DEADLINE', 180))
+
 def generate_moderator_speech(round_num: int, total_rounds: int, topic: str):
     if round_num == 1:
         return f"Welcome to our debate on the topic of {topic}. We'll begin with opening statements from both sides."
@@ -28,22 +34,32 @@ def generate_moderator_speech(round_num: int, total_rounds: int, topic: str):
     else:
         return f"We'll now proceed to round {round_num} of our debate on the topic {topic}."
 
-def generate_and_save_speech(topic: str, position: str, round_num: int, total_rounds: int, debate_transcript: str, opponent_argument: str = None):
+def generate_and_save_speech(topic: str, position: str, round_num: int, total_rounds: int, debate_transcript: str, opponent_argument: str = None, prefetcher: ResearchPrefetcher = None, manager: DebateDataManager = None):
+    if position == "moderator":
+        speech_file_path = Path(__file__).parent / f"speech_{round_num}_aaa.mp3"
+    else:
+        speech_file_path = Path(__file__).parent / f"speech_{round_num}_{position}.mp3"
+
     if position == "moderator":
         debate_text = generate_moderator_speech(round_num, total_rounds, topic)
     else:
-        debate_text = generate_oral_argument(topic, position, round_num, total_rounds, opponent_argument)
-        if round_num > 1:
-            debate_text = revise_argument(debate_text, debate_transcript, position, topic)
-    
+        with deadline(TURN_DEADLINE):
+            # Waiting on prefetched research counts against this turn's budget too
+            bullet_points = prefetcher.get(position, round_num) if prefetcher else None
+            debate_text = generate_oral_argument(topic, position, round_num, total_rounds, opponent_argument, bullet_points, manager)
+            if debate_text is not None and round_num > 1:
+                debate_text = revise_argument(debate_text, debate_transcript, position, topic)
+        if debate_text is None:
+            logger.error(f"No argument could be generated for {position} in round {round_num}; skipping this turn")
+            # Remove audio left over from an earlier debate so it isn't spliced into this one
+            speech_file_path.unlink(missing_ok=True)
+            return ""
+
     print(f"{position.capitalize()} - Round {round_num}:")
     print(debate_text)
 
-    client = OpenAI_RAW()
-    if position == "moderator":
-        speech_file_path = Path(__file__).parent / f"speech_{round_num}_aaa.mp3"
-    else:
-        speech_file_path = Path(__file__).parent / f"speech_{round_num}_{position}.mp3"
+    # Retries are handled by call_with_resilience below
+    client = OpenAI_RAW(max_retries=0)
     match position:
         case "for":
             voice = "fable"
@@ -54,45 +70,70 @@ def generate_and_save_speech(topic: str, position: str, round_num: int, total_ro
         case _:
             raise ValueError("Invalid position")
 
-    with client.audio.speech.with_streaming_response.create(
-        model="tts-1-hd",
-        voice=voice,
-        input=debate_text
-    ) as response:
-        response.stream_to_file(speech_file_path)
+    def synthesize():
+        with client.audio.speech.with_streaming_response.create(
+            model="tts-1-hd",
+            voice=voice,
+            input=debate_text,
+            timeout=clamp_timeout(120.0)
+        ) as response:
+            response.stream_to_file(speech_file_path)
+
+    try:
+        with deadline(TTS_DEADLINE):
+            call_with_resilience("tts", synthesize)
+    except Exception as e:
+        # Keep the debate going; the transcript still has this turn, only the audio is missing
+        logger.error(f"Error generating speech for {position} in round {round_num}: {str(e)}")
+        speech_file_path.unlink(missing_ok=True)
+        return debate_text
 
     logger.info(f"Speech for {position} position in round {round_num} saved to {speech_file_path}")
     return debate_text
 
-def run_debate(topic: str, total_rounds: int = 5):
+def run_debate(topic: str, total_rounds: int = 5, prefetch: bool = True):
     manager = DebateDataManager()
     debate_transcript = ""
 
-    for round_num in range(1, total_rounds + 1):
-        # Moderator introduces the round
-        moderator_text = generate_and_save_speech(topic, "moderator", round_num, total_rounds, debate_transcript)
-        debate_transcript += f"\nModerator (Round {round_num}): {moderator_text}\n"
-
-        # Generate and save arguments for both positions
-        for_context = manager.get_argument(round_num - 1, "against") if round_num > 1 else None
-        against_context = manager.get_argument(round_num - 1, "for") if round_num > 1 else None
-
-        for_text = generate_and_save_speech(topic, "for", round_num, total_rounds, debate_transcript, for_context)
-        debate_transcript += f"\nFor (Round {round_num}): {for_text}\n"
-
-        against_text = generate_and_save_speech(topic, "against", round_num, total_rounds, debate_transcript, against_context)
-        debate_transcript += f"\nAgainst (Round {round_num}): {against_text}\n"
-
-        # Save arguments
-        manager.add_argument(round_num, "for", topic, for_text)
-        manager.add_argument(round_num, "against", topic, against_text)
-
-    # Moderator concludes the debate
-    final_moderator_text = generate_and_save_speech(topic, "moderator", total_rounds + 1, total_rounds, debate_transcript)
-    debate_transcript += f"\nModerator (Conclusion): {final_moderator_text}\n"
-
-    # Save the full debate transcript
-    manager.save_full_transcript(topic, debate_transcript)
+    # Research for upcoming rounds runs in the background while the current round
+    # is being written and spoken
+    prefetcher = ResearchPrefetcher(manager, topic, total_rounds, TURN_DEADLINE) if prefetch else None
+
+    try:
+        for round_num in range(1, total_rounds + 1):
+            if prefetcher:
+                prefetcher.prefetch(round_num)
+                prefetcher.prefetch(round_num + 1)
+
+            # Moderator introduces the round
+            moderator_text = generate_and_save_speech(topic, "moderator", round_num, total_rounds, debate_transcript)
+            debate_transcript += f"\nModerator (Round {round_num}): {moderator_text}\n"
+
+            # Generate and save arguments for both positions
+            for_context = manager.get_argument(round_num - 1, "against") if round_num > 1 else None
+            against_context = manager.get_argument(round_num - 1, "for") if round_num > 1 else None
+
+            for_text = generate_and_save_speech(topic, "for", round_num, total_rounds, debate_transcript, for_context, prefetcher, manager)
+            if for_text:
+                debate_transcript += f"\nFor (Round {round_num}): {for_text}\n"
+
+            against_text = generate_and_save_speech(topic, "against", round_num, total_rounds, debate_transcript, against_context, prefetcher, manager)
+            if against_text:
+                debate_transcript += f"\nAgainst (Round {round_num}): {against_text}\n"
+
+            # Save arguments
+            manager.add_argument(round_num, "for", topic, for_text)
+            manager.add_argument(round_num, "against", topic, against_text)
+
+        # Moderator concludes the debate
+        final_moderator_text = generate_and_save_speech(topic, "moderator", total_rounds + 1, total_rounds, debate_transcript)
+        debate_transcript += f"\nModerator (Conclusion): {final_moderator_text}\n"
+
+        # Save the full debate transcript
+        manager.save_full_transcript(topic, debate_transcript)
+    finally:
+        if prefetcher:
+            prefetcher.shutdown()
 
 topic = "pet ownership"
 total_rounds = 4
@@ -19,29 +19,34 @@ silence_duration=1
 temp_dir=$(mktemp -d)
 
 # Function to add silence to the end of a file
+# and append it to the concat list. Turns whose audio could not be generated are skipped.
 add_silence() {
     local input_file=$1
     local output_file=$2
+    if [ ! -f "$input_file" ]; then
+        echo "Warning: $input_file not found, skipping"
+        return
+    fi
     ffmpeg -i "$input_file" -af "apad=pad_dur=$silence_duration" -c:a libmp3lame "$output_file"
+    echo "file '$output_file'" >> concat_list.txt
 }
 
 # Process each file
 for i in $(seq 1 $rounds); do
     # aaa
     add_silence "speech_${i}_aaa.mp3" "${temp_dir}/silenced_${i}_aaa.mp3"
-    echo "file '${temp_dir}/silenced_${i}_aaa.mp3'" >> concat_list.txt
 
     # For position
     add_silence "speech_${i}_for.mp3" "${temp_dir}/silenced_${i}_for.mp3"
-    echo "file '${temp_dir}/silenced_${i}_for.mp3'" >> concat_list.txt
 
     # Against position
     add_silence "speech_${i}_against.mp3" "${temp_dir}/silenced_${i}_against.mp3"
-    echo "file '${temp_dir}/silenced_${i}_against.mp3'" >> concat_list.txt
 done
 
 # Add the final aaa speech (without added silence)
-echo "file 'speech_$((rounds+1))_aaa.mp3'" >> concat_list.txt
+if [ -f "speech_$((rounds+1))_aaa.mp3" ]; then
+    echo "file 'speech_$((rounds+1))_aaa.mp3'" >> concat_list.txt
+fi
 
 # Concatenate the files
 ffmpeg -f concat -safe 0 -i concat_list.txt -c copy "$output_file"
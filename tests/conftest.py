@@ -0,0 +1,33 @@
+import os
+import sys
+import types
+
+# Make the app package importable when pytest is run from the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def _stub_missing_module(name: str, **attributes):
+    """Register a minimal stand-in for an optional runtime dependency that isn't installed.
+
+    The router logic under test never builds a real client, it only needs these
+    imports to resolve.
+    """
+    try:
+        __import__(name)
+    except ImportError:
+        module = types.ModuleType(name)
+        module.__dict__.update(attributes)
+        sys.modules[name] = module
+
+
+_stub_missing_module("dotenv", load_dotenv=lambda *args, **kwargs: None)
+_stub_missing_module("llama_index")
+_stub_missing_module("llama_index.llms")
+_stub_missing_module("llama_index.llms.openai", OpenAI=None)
+_stub_missing_module("llama_index.program")
+_stub_missing_module("llama_index.program.openai", OpenAIPydanticProgram=None)
+_stub_missing_module("llama_index.core")
+_stub_missing_module("llama_index.core.program", LLMTextCompletionProgram=None)
+_stub_missing_module("duckduckgo_search", DDGS=None)
+_stub_missing_module("playwright")
+_stub_missing_module("playwright.sync_api", sync_playwright=None)
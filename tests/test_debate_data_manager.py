@@ -0,0 +1,38 @@
+import pytest
+
+from app.debate_data_manager import DebateDataManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return DebateDataManager(file_path=str(tmp_path / "debate_data.json"))
+
+
+def test_add_round_replaces_earlier_research_and_keeps_argument(manager):
+    manager.add_round(1, "for", "veganism", [{"title": "Old", "href": "https://example.com/old"}], ["old point"])
+    manager.add_argument(1, "for", "veganism", "Veganism is good.")
+
+    manager.add_round(1, "for", "veganism", [{"title": "New", "href": "https://example.com/new"}], ["new point"])
+
+    rounds = manager.get_all_rounds()
+    assert len(rounds) == 1
+    assert rounds[0]["bullet_points"] == ["new point"]
+    assert rounds[0]["sources"] == [{"title": "New", "href": "https://example.com/new"}]
+    assert rounds[0]["argument"] == "Veganism is good."
+
+
+def test_add_round_keeps_other_rounds_positions_and_topics_separate(manager):
+    manager.add_round(1, "for", "veganism", [], ["a"])
+    manager.add_round(1, "against", "veganism", [], ["b"])
+    manager.add_round(2, "for", "veganism", [], ["c"])
+    manager.add_round(1, "for", "pet ownership", [], ["d"])
+
+    assert len(manager.get_all_rounds()) == 4
+
+
+def test_research_is_persisted(manager):
+    manager.add_round(1, "for", "veganism", [], ["first", "second"])
+
+    reloaded = DebateDataManager(file_path=manager.file_path)
+    assert reloaded.get_research(1, "for", "veganism") == "• first\n• second"
+    assert reloaded.get_research(1, "against", "veganism") == ""
@@ -0,0 +1,211 @@
+import json
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from app import model_router
+from app.model_router import Endpoint, ModelRouter
+from app.resilience import DeadlineExceeded, RetryPolicy, deadline
+
+
+def make_endpoints(*models):
+    # A unique api_base per test keeps the process-wide circuit breakers independent
+    api_base = f"http://test-{uuid.uuid4()}"
+    return [Endpoint(model=model, api_base=api_base) for model in models]
+
+
+def make_router(routes, **kwargs):
+    kwargs.setdefault("retry_policy", RetryPolicy(max_attempts=1))
+    router = ModelRouter(routes=routes, **kwargs)
+    # Hand the endpoint itself to the call instead of building a real client
+    router.build_llm = lambda endpoint, temperature: endpoint
+    return router
+
+
+@pytest.fixture
+def release():
+    event = threading.Event()
+    yield event
+    # Let any deliberately slow attempts finish so no threads outlive the test
+    event.set()
+
+
+def test_uses_primary_endpoint_when_healthy():
+    router = make_router({"argument": make_endpoints("primary", "secondary")})
+    assert router.run("argument", lambda endpoint: endpoint.model) == "primary"
+
+
+def test_fails_over_in_order_and_demotes_failing_endpoint():
+    router = make_router({"argument": make_endpoints("primary", "secondary", "tertiary")})
+    tried = []
+
+    def call(endpoint):
+        tried.append(endpoint.model)
+        if endpoint.model == "primary":
+            raise RuntimeError("primary down")
+        return endpoint.model
+
+    assert router.run("argument", call) == "secondary"
+    assert tried == ["primary", "secondary"]
+
+    # Repeated failures push the primary behind the healthy endpoints
+    for _ in range(2):
+        router.run("argument", call)
+    assert [endpoint.model for endpoint in router.ordered_endpoints("argument")] == ["secondary", "tertiary", "primary"]
+
+
+def test_raises_last_error_when_every_endpoint_fails():
+    router = make_router({"judge": make_endpoints("a", "b")})
+
+    def call(endpoint):
+        raise RuntimeError(f"{endpoint.model} failed")
+
+    with pytest.raises(RuntimeError, match="b failed"):
+        router.run("judge", call)
+
+
+def test_hedges_slow_primary_with_next_endpoint(release):
+    router = make_router({"argument": make_endpoints("slow", "fast")}, hedge_after=0.05)
+
+    def call(endpoint):
+        if endpoint.model == "slow":
+            release.wait(5)
+            return "slow"
+        return "fast"
+
+    start = time.monotonic()
+    assert router.run("argument", call) == "fast"
+    assert time.monotonic() - start < 1
+
+
+def test_deadline_expiry_inside_run(release):
+    router = make_router({"argument": make_endpoints("slow")}, hedge_after=5)
+
+    def call(endpoint):
+        release.wait(5)
+        return "too late"
+
+    start = time.monotonic()
+    with deadline(0.1):
+        with pytest.raises(DeadlineExceeded):
+            router.run("argument", call)
+    assert time.monotonic() - start < 1
+
+
+def test_latency_is_tracked_per_stage():
+    shared = make_endpoints("shared")[0]
+    other = Endpoint(model="other", api_base=shared.api_base)
+    router = make_router({"search": [shared], "argument": [shared, other]}, hedge_after=20)
+
+    router.run("search", lambda endpoint: "quick")
+
+    # A fast search call must not shorten the hedge delay for argument calls
+    assert router._latency_for("search", shared).latency is not None
+    assert router._latency_for("argument", shared).latency is None
+    assert router._hedge_delay("argument", shared) == 20
+
+
+def test_unknown_stage_is_rejected():
+    router = make_router({"argument": make_endpoints("primary")})
+    with pytest.raises(ValueError):
+        router.run("arguments", lambda endpoint: None)
+
+
+def test_from_env_reads_routes_file(tmp_path, monkeypatch):
+    routes_file = tmp_path / "routes.json"
+    routes_file.write_text(json.dumps({
+        "argument": [{"model": "llama3.1", "api_base": "http://localhost:11434/v1", "is_function_calling_model": False}],
+    }))
+    monkeypatch.setenv("LLM_ROUTES_FILE", str(routes_file))
+
+    router = ModelRouter.from_env()
+    endpoint = router.routes["argument"][0]
+    assert endpoint.model == "llama3.1"
+    assert endpoint.is_function_calling_model is False
+    # Stages missing from the file keep their defaults
+    assert router.routes["judge"][0].model == "gpt-4-turbo-preview"
+
+
+def test_from_env_rejects_unknown_stage(tmp_path, monkeypatch):
+    routes_file = tmp_path / "routes.json"
+    routes_file.write_text(json.dumps({"arguments": [{"model": "gpt-4o"}]}))
+    monkeypatch.setenv("LLM_ROUTES_FILE", str(routes_file))
+
+    with pytest.raises(ValueError, match="arguments"):
+        ModelRouter.from_env()
+
+
+def test_from_env_rejects_unknown_endpoint_key(tmp_path, monkeypatch):
+    routes_file = tmp_path / "routes.json"
+    routes_file.write_text(json.dumps({"argument": [{"model": "llama3.1", "base_url": "http://localhost:11434/v1"}]}))
+    monkeypatch.setenv("LLM_ROUTES_FILE", str(routes_file))
+
+    # pydantic's ValidationError is a ValueError
+    with pytest.raises(ValueError, match="base_url"):
+        ModelRouter.from_env()
+
+
+class FakeProgram:
+    """Stands in for a llama_index program: records which kind was built and returns a canned result."""
+
+    def __init__(self, kind, llm, output_cls):
+        self.kind = kind
+        self.llm = llm
+        self.output_cls = output_cls
+
+    def __call__(self):
+        return self.output_cls(kind=self.kind, model=self.llm.model)
+
+
+class FakeOpenAIPydanticProgram:
+    @classmethod
+    def from_defaults(cls, output_cls, llm, prompt_template_str, verbose=False):
+        # Mirrors llama_index, which refuses models without tool-call support
+        if not llm.metadata.is_function_calling_model:
+            raise ValueError(f"Model name {llm.model} does not support function calling API.")
+        return FakeProgram("function_calling", llm, output_cls)
+
+
+class FakeLLMTextCompletionProgram:
+    @classmethod
+    def from_defaults(cls, output_cls, llm, prompt_template_str, verbose=False):
+        return FakeProgram("text_completion", llm, output_cls)
+
+
+class ProgramResult(BaseModel):
+    kind: str
+    model: str
+
+
+@pytest.fixture
+def fake_programs(monkeypatch):
+    monkeypatch.setattr(model_router, "OpenAIPydanticProgram", FakeOpenAIPydanticProgram)
+    monkeypatch.setattr(model_router, "LLMTextCompletionProgram", FakeLLMTextCompletionProgram)
+
+
+def make_program_router(routes):
+    router = make_router(routes)
+    router.build_llm = lambda endpoint, temperature: SimpleNamespace(
+        model=endpoint.model,
+        metadata=SimpleNamespace(is_function_calling_model=endpoint.is_function_calling_model),
+    )
+    return router
+
+
+def test_run_program_uses_text_completion_without_tool_support(fake_programs):
+    local = Endpoint(model="llama3.1", api_base=f"http://test-{uuid.uuid4()}", is_function_calling_model=False)
+    router = make_program_router({"argument": [local]})
+
+    result = router.run_program("argument", ProgramResult, "prompt")
+    assert result == ProgramResult(kind="text_completion", model="llama3.1")
+
+
+def test_run_program_uses_function_calling_when_supported(fake_programs):
+    router = make_program_router({"argument": make_endpoints("gpt-4o")})
+
+    result = router.run_program("argument", ProgramResult, "prompt")
+    assert result == ProgramResult(kind="function_calling", model="gpt-4o")
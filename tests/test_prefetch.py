@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from app import make_argument, prefetch
+from app.debate_data_manager import DebateDataManager
+from app.make_argument import OralArgument, generate_oral_argument
+from app.prefetch import ResearchPrefetcher
+from app.resilience import deadline
+
+TOPIC = "veganism"
+
+
+class FakeRouter:
+    """Records prompts instead of calling a model."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def run_program(self, stage, output_cls, prompt_template_str, temperature=0.7):
+        self.prompts.append(prompt_template_str)
+        return OralArgument(speech="A speech.")
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return DebateDataManager(file_path=str(tmp_path / "debate_data.json"))
+
+
+@pytest.fixture
+def router(monkeypatch):
+    fake = FakeRouter()
+    monkeypatch.setattr(make_argument, "get_router", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def inline_research(monkeypatch):
+    calls = []
+
+    def fake_research(topic, position, round_num, additional_context=None, manager=None):
+        calls.append((topic, position, round_num))
+        return "• inline point"
+
+    monkeypatch.setattr(make_argument, "research", fake_research)
+    return calls
+
+
+@pytest.fixture
+def prefetcher(manager):
+    prefetcher = ResearchPrefetcher(manager, TOPIC, total_rounds=3, turn_deadline=60)
+    yield prefetcher
+    prefetcher.shutdown()
+
+
+def test_prefetched_bullet_points_are_used_instead_of_inline_research(monkeypatch, manager, prefetcher, router, inline_research):
+    def background_research(topic, position, round_num, additional_context=None, manager=None):
+        manager.add_round(round_num, position, topic, [], [f"prefetched {position} point"])
+
+    monkeypatch.setattr(prefetch, "research", background_research)
+    prefetcher.prefetch(1)
+
+    bullet_points = prefetcher.get("for", 1)
+    assert bullet_points == "• prefetched for point"
+
+    assert generate_oral_argument(TOPIC, "for", 1, 3, None, bullet_points, manager) == "A speech."
+    assert inline_research == []
+    assert "• prefetched for point" in router.prompts[0]
+
+
+def test_failed_prefetch_falls_back_to_inline_research(monkeypatch, manager, prefetcher, router, inline_research):
+    def failing_research(topic, position, round_num, additional_context=None, manager=None):
+        raise RuntimeError("search is down")
+
+    monkeypatch.setattr(prefetch, "research", failing_research)
+    prefetcher.prefetch(1)
+
+    bullet_points = prefetcher.get("for", 1)
+    assert bullet_points is None
+
+    generate_oral_argument(TOPIC, "for", 1, 3, None, bullet_points, manager)
+    assert inline_research == [(TOPIC, "for", 1)]
+    assert "• inline point" in router.prompts[0]
+
+
+def test_conclusion_round_is_not_prefetched(monkeypatch, prefetcher):
+    monkeypatch.setattr(prefetch, "research", lambda *args, **kwargs: None)
+    prefetcher.prefetch(3)
+
+    assert prefetcher.prefetched == {}
+    assert prefetcher.get("for", 3) is None
+
+
+def test_wait_for_prefetch_is_bounded_by_turn_deadline(monkeypatch, prefetcher):
+    release = threading.Event()
+    monkeypatch.setattr(prefetch, "research", lambda *args, **kwargs: release.wait(5))
+    prefetcher.prefetch(1)
+
+    start = time.monotonic()
+    try:
+        with deadline(0.2):
+            # Times out: the argument is written without research rather than researching inline
+            assert prefetcher.get("for", 1) == ""
+    finally:
+        release.set()
+    assert time.monotonic() - start < 1
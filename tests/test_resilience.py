@@ -0,0 +1,216 @@
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app import resilience
+from app.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    RetryPolicy,
+    call_with_resilience,
+    deadline,
+    get_breaker,
+    is_retryable,
+    retry_after_seconds,
+    time_remaining,
+)
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code: int, headers: dict = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+def unique_service() -> str:
+    # Breakers are process-wide, so every test gets its own service name
+    return f"test-{uuid.uuid4()}"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(resilience.time, "sleep", slept.append)
+    return slept
+
+
+def test_retry_after_seconds_parses_numeric_header():
+    assert retry_after_seconds(HTTPError(429, {"retry-after": "2.5"})) == 2.5
+
+
+def test_retry_after_seconds_prefers_milliseconds_header():
+    assert retry_after_seconds(HTTPError(429, {"retry-after-ms": "1500", "retry-after": "9"})) == 1.5
+
+
+def test_retry_after_seconds_parses_http_date():
+    when = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 30))
+    assert 25 <= retry_after_seconds(HTTPError(429, {"retry-after": when})) <= 30
+
+
+def test_retry_after_seconds_ignores_missing_or_invalid_headers():
+    assert retry_after_seconds(RuntimeError("no response")) is None
+    assert retry_after_seconds(HTTPError(429)) is None
+    assert retry_after_seconds(HTTPError(429, {"retry-after": "soon"})) is None
+
+
+@pytest.mark.parametrize("error, expected", [
+    (HTTPError(429), True),
+    (HTTPError(408), True),
+    (HTTPError(409), True),
+    (HTTPError(500), True),
+    (HTTPError(503), True),
+    (HTTPError(400), False),
+    (HTTPError(401), False),
+    (HTTPError(404), False),
+    (ValueError("bad config"), False),
+    (DeadlineExceeded(), False),
+    (CircuitOpenError(), False),
+    (ConnectionError("reset"), True),
+])
+def test_is_retryable(error, expected):
+    assert is_retryable(error) is expected
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_timeout(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("svc", failure_threshold=2, reset_timeout=10)
+
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    now[0] += 10
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    # Only one trial call is let through while half-open
+    assert not breaker.allow()
+
+
+def test_breaker_half_open_success_closes(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("svc", failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    now[0] += 10
+    assert breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0 and breaker.allow()
+
+
+def test_breaker_half_open_failure_reopens(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("svc", failure_threshold=3, reset_timeout=10)
+    for _ in range(3):
+        breaker.record_failure()
+    now[0] += 10
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+
+def test_call_with_resilience_retries_transient_errors(sleeps):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise HTTPError(503)
+        return "ok"
+
+    assert call_with_resilience(unique_service(), flaky, RetryPolicy(max_attempts=4)) == "ok"
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_call_with_resilience_does_not_retry_client_errors(sleeps):
+    calls = []
+
+    def bad_request():
+        calls.append(1)
+        raise HTTPError(400)
+
+    with pytest.raises(HTTPError):
+        call_with_resilience(unique_service(), bad_request)
+    assert len(calls) == 1 and not sleeps
+
+
+def test_call_with_resilience_honours_retry_after(sleeps):
+    errors = [HTTPError(429, {"retry-after": "2"})]
+
+    def rate_limited():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert call_with_resilience(unique_service(), rate_limited, RetryPolicy(max_attempts=3, max_delay=5)) == "ok"
+    assert sleeps == [2.0]
+
+
+def test_call_with_resilience_gives_up_when_retry_after_exceeds_max_delay(sleeps):
+    calls = []
+
+    def rate_limited():
+        calls.append(1)
+        raise HTTPError(429, {"retry-after": "30"})
+
+    with pytest.raises(HTTPError) as info:
+        call_with_resilience(unique_service(), rate_limited, RetryPolicy(max_attempts=3, max_delay=5))
+    assert info.value.status_code == 429
+    assert len(calls) == 1 and not sleeps
+
+
+def test_call_with_resilience_raises_last_error_when_exhausted(sleeps):
+    with pytest.raises(HTTPError) as info:
+        call_with_resilience(unique_service(), lambda: (_ for _ in ()).throw(HTTPError(502)), RetryPolicy(max_attempts=2))
+    assert info.value.status_code == 502
+
+
+def test_call_with_resilience_fails_fast_when_breaker_open():
+    service = unique_service()
+    breaker = get_breaker(service)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        call_with_resilience(service, lambda: "never called")
+
+
+def test_call_with_resilience_surfaces_error_that_reopens_breaker(monkeypatch, sleeps):
+    now = [100.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    service = unique_service()
+    breaker = get_breaker(service)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    now[0] += breaker.reset_timeout
+
+    # The half-open trial fails: the original error is raised, not CircuitOpenError
+    with pytest.raises(HTTPError):
+        call_with_resilience(service, lambda: (_ for _ in ()).throw(HTTPError(503)))
+    assert breaker.state == "open" and not sleeps
+
+
+def test_call_with_resilience_does_not_sleep_past_deadline(sleeps):
+    with deadline(0.5):
+        with pytest.raises(DeadlineExceeded):
+            call_with_resilience(unique_service(), lambda: (_ for _ in ()).throw(HTTPError(429, {"retry-after": "1"})))
+    assert not sleeps
+
+
+def test_nested_deadlines_only_tighten():
+    assert time_remaining() is None
+    with deadline(10):
+        with deadline(100):
+            assert time_remaining() <= 10
+        with deadline(fraction=0.5):
+            assert time_remaining() <= 5
+    assert time_remaining() is None